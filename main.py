@@ -1,12 +1,67 @@
 # main.py
 
+import ast
+import keyword
+import os
 import sys
 import re
-from typing import Tuple, Dict, Any
+import warnings
+from collections import namedtuple
+from types import CodeType
+from typing import Tuple, Dict, Any, Union
 
 # --- Global Storage for Blueprints ---
+class Blueprints:
+    """The function and class definitions visible to one script or module."""
+    __slots__ = ('functions', 'classes')
+
+    def __init__(self, functions: Dict[str, dict] = None, classes: Dict[str, dict] = None):
+        self.functions = {} if functions is None else functions
+        self.classes = {} if classes is None else classes
+
 FUNCTIONS: Dict[str, dict] = {}
 CLASSES: Dict[str, dict] = {}
+_MAIN_BLUEPRINTS = Blueprints(FUNCTIONS, CLASSES)
+
+# Loaded modules by real path: (module variables, functions, classes)
+_MODULE_CACHE: Dict[str, Tuple[dict, dict, dict]] = {}
+
+# --- Precompiled Patterns ---
+_STRIP_COMMENTS = re.compile(r'(?<!\$)\{.*?\}')
+_SUBST = re.compile(r'\$\{([^{}]*?)\}')
+_FUNC_CALL = re.compile(r'^([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$')
+_METHOD_CALL = re.compile(r'^(.*)\.([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$')
+_STEAL = re.compile(r'^steal\s+([a-zA-Z_][a-zA-Z0-9_]*)\s+from\s+([^\s]+)$')
+_NEW = re.compile(r'new\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)')
+_FUNC_DEF = re.compile(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)')
+_IDENTIFIER = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+
+# --- Expression Environment ---
+# Built once and shared by every safe_eval() call.
+_ALLOWED_BUILTINS = {
+    "True": True,
+    "False": False,
+    "None": None,
+    "str": str,
+    "int": int,
+    "float": float,
+    "list": list,
+    "dict": dict,
+    "len": len,
+    "type": type,
+}
+_EVAL_GLOBALS = {"__builtins__": _ALLOWED_BUILTINS}
+
+# Returned by safe_eval() when an expression cannot be evaluated, so that
+# a genuine None result can be told apart from a failure.
+_EVAL_ERROR = object()
+
+# --- Compiled Expression Cache ---
+# Maps expression source to its code object, to the name itself for a bare
+# variable name, or to None if it does not compile.
+# Oldest entries are evicted first once the cap is reached.
+_CODE_CACHE: Dict[str, Union[CodeType, str, None]] = {}
+_CODE_CACHE_SIZE = 4096
 
 # --- Debugging ---
 DEBUG = False
@@ -18,416 +73,744 @@ def strip_inline_comments(line: str) -> str:
     """
     Removes all inline comments in the format { ... } unless preceded by $.
     """
-    pattern = r'(?<!\$)\{.*?\}'
-    return re.sub(pattern, '', line)
+    return _STRIP_COMMENTS.sub('', line)
 
 def substitute_vars(line: str, variables: dict) -> str:
     """
-    Recursively finds and replaces all ${...} expressions in a line.
+    Replaces all ${...} expressions in a line, one pass at a time, until
+    none are left; filling in an inner placeholder can complete an outer
+    one, as in ${item${i}}. Stops at the leftmost placeholder that cannot
+    be evaluated and leaves the rest of the line untouched.
     """
-    pattern = r'\$\{([^{}]*?)\}'
-    while (match := re.search(pattern, line)):
-        expression = match.group(1)
-        value = safe_eval(expression, variables)
-        if value is not None:
+    if '$' not in line:
+        return line
+
+    while True:
+        parts = []
+        last = 0
+        for match in _SUBST.finditer(line):
+            expression = match.group(1)
+            value = safe_eval(expression, variables)
+            if value is _EVAL_ERROR:
+                if not parts:
+                    print(f"Warning: Could not evaluate nested expression '${expression}'.")
+                    return line
+                # Earlier replacements may complete an outer placeholder
+                # to the left; run another pass before giving up.
+                break
+            parts.append(line[last:match.start()])
             # Use str() so strings don't get extra quotes in output
-            replacement = str(value)
-            line = line[:match.start()] + replacement + line[match.end():]
-        else:
-            print(f"Warning: Could not evaluate nested expression '${expression}'.")
+            parts.append(str(value))
+            last = match.end()
+        if not parts:
+            return line
+        parts.append(line[last:])
+        line = ''.join(parts)
+        if '$' not in line or _SUBST.search(line) is None:
             return line
-    return line
+
+def _compile_expr(expression: str) -> Union[CodeType, str, None]:
+    """
+    Returns the cached code object for an expression, compiling it on first use.
+    Bare variable names are returned as the name so they can skip eval().
+    """
+    code = _CODE_CACHE.get(expression)
+    if code is not None or expression in _CODE_CACHE:
+        return code
+    # eval() ignores leading blanks in source strings; compile() does not
+    source = expression.lstrip(' \t')
+    name = source.rstrip()
+    if _IDENTIFIER.fullmatch(name) and not keyword.iskeyword(name):
+        code = name
+    else:
+        try:
+            code = compile(source, '<mslash>', 'eval')
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            # Deep or huge expressions can exhaust the compiler as well
+            code = None
+    if len(_CODE_CACHE) >= _CODE_CACHE_SIZE:
+        del _CODE_CACHE[next(iter(_CODE_CACHE))]
+    _CODE_CACHE[expression] = code
+    return code
+
+def _prewarm(expression: str) -> str:
+    """Compiles an expression at parse time when it has no ${...} to fill in."""
+    if '$' not in expression and expression not in _CODE_CACHE:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            _compile_expr(expression)
+        if caught:
+            # Leave it to compile (and warn) only if the line actually runs
+            del _CODE_CACHE[expression]
+    return expression
 
 def safe_eval(expression: str, variables: dict):
     """
     Safely evaluates an MSlash expression.
+    Returns _EVAL_ERROR if it cannot be evaluated.
     """
-    allowed_builtins = {
-        "True": True,
-        "False": False,
-        "None": None,
-        "str": str,
-        "int": int,
-        "float": float,
-        "list": list,
-        "dict": dict,
-        "len": len,
-        "type": type,
-    }
-    eval_globals = {"__builtins__": allowed_builtins}
-
-    # Inject this.attributes as locals; keep 'this' for attribute-style access
-    eval_locals = variables.copy()
-    if 'this' in eval_locals and isinstance(eval_locals['this'], MSlashObject):
-        eval_locals.update(eval_locals['this'].attributes)
+    code = _compile_expr(expression)
+    if code is None:
+        return _EVAL_ERROR
+
+    this = variables.get('this')
+    if code.__class__ is str:
+        # Bare name: resolve it in the same order eval() would
+        if isinstance(this, MSlashObject) and code in this.attributes:
+            return this.attributes[code]
+        value = variables.get(code, _EVAL_ERROR)
+        if value is _EVAL_ERROR:
+            value = _ALLOWED_BUILTINS.get(code, _EVAL_ERROR)
+        return value
+
+    # Inject this.attributes as locals; keep 'this' for attribute-style access.
+    # Assignment expressions get a throwaway copy so they never write into
+    # the scope; otherwise the scope is read in place.
+    if isinstance(this, MSlashObject):
+        eval_locals = {**variables, **this.attributes}
+    elif ':=' in expression:
+        eval_locals = variables.copy()
+    else:
+        eval_locals = variables
 
     try:
-        return eval(expression, eval_globals, eval_locals)
+        return eval(code, _EVAL_GLOBALS, eval_locals)
     except Exception:
-        return None
+        # Only script expressions reach eval(), so any error is a script error
+        return _EVAL_ERROR
+
+def _eval_or_none(expression: str, variables: dict):
+    """Evaluates an expression where a failure should simply yield None."""
+    value = safe_eval(expression, variables)
+    return None if value is _EVAL_ERROR else value
 
 class MSlashObject:
     """Represents an instance of an MSlash class."""
+    __slots__ = ('class_name', 'attributes')
+
     def __init__(self, class_name: str):
-        # Avoid recursion in __setattr__
-        super().__setattr__('class_name', class_name)
-        super().__setattr__('attributes', {})
+        self.class_name = class_name
+        self.attributes = {}
 
     def __repr__(self):
         return f"<instance of {self.class_name}>"
 
     # Allow attribute-style reads: this.foo -> attributes["foo"]
+    # (only reached for names that are not slots)
     def __getattr__(self, name: str):
-        attrs = super().__getattribute__('attributes')
-        if name in attrs:
-            return attrs[name]
-        raise AttributeError(name)
-
-    # Optional: if Python eval ever does "this.x = y", route it to attributes
-    def __setattr__(self, name: str, value: Any):
-        if name in ('class_name', 'attributes'):
-            super().__setattr__(name, value)
+        try:
+            return self.attributes[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+# --- Preparsed Instructions ---
+# Every non-empty script line is parsed once into an Instr:
+#   op      - one of the OP_* opcodes below
+#   payload - the pieces of the line the handler needs; if/loop payloads
+#             also hold the indices of their matching else/end lines, return
+#             payloads the ends of the if/loops around them (innermost
+#             first), and each expression is paired with a flag saying
+#             whether it has ${...} to fill in
+#   lineno  - line number reported in error messages
+#   source  - the cleaned line, kept for debug output
+Instr = namedtuple('Instr', 'op payload lineno source')
+
+# --- Opcodes ---
+# Statement opcodes come first and index _HANDLERS; everything from
+# OP_RETURN on steers control flow and is handled inline by execute().
+# OP_RUN is a superinstruction standing for a run of statements.
+OP_STEAL = 0
+OP_CALL = 1
+OP_NEW = 2
+OP_METHOD = 3
+OP_SET_ATTR = 4
+OP_VAR = 5
+OP_SAY = 6
+OP_PRINT = 7
+OP_INPUT = 8
+OP_MATH = 9
+OP_EMPTYLINE = 10
+OP_PAUSE = 11
+OP_BREAK = 12
+OP_HELP = 13
+OP_NOP = 14
+OP_ERROR = 15
+OP_RETURN = 16
+OP_IF = 17
+OP_ELSE = 18
+OP_LOOP = 19
+OP_ENDLOOP = 20
+OP_RUN = 21
+
+_BLOCK_OPENERS = ("if ", "loop ", "func ", "class ")
+_BLOCK_CLOSERS = ("endif", "endloop", "endfunc", "endclass")
+
+# Statement opcodes that assign into the current variable scope
+_SCOPE_WRITERS = frozenset((OP_STEAL, OP_NEW, OP_VAR, OP_INPUT))
+
+def _parse_args(arg_str: str) -> tuple:
+    """Splits a call's argument string into (expression, has ${...}) pairs."""
+    if not arg_str:
+        return ()
+    return tuple((_prewarm(v.strip()), '$' in v) for v in arg_str.split(','))
+
+def _parse_line(line: str, lineno: int, allow_call: bool = True) -> Tuple[int, Any]:
+    """
+    Runs the line patterns once and returns the (op, payload) pair for a line.
+    Commands are recognised in the same order execute() has always used.
+    Names that become dict keys at run time are interned.
+    """
+    # Cheap checks first: the call patterns only run on lines ending in ')',
+    # and keywords are narrowed down by their first character
+    first = line[0]
+    ends_call = line[-1] == ')'
+
+    # --- Module Import: steal <symbol> from <file>.mslash ---
+    if first == 's' and line.startswith("steal "):
+        steal_match = _STEAL.match(line)
+        if not steal_match:
+            return OP_ERROR, f"Syntax Error on line {lineno}: Invalid steal syntax."
+        symbol, module_path = steal_match.groups()
+        return OP_STEAL, (sys.intern(symbol), module_path)
+
+    # --- Global Function Call (statement) ---
+    # Whether the name is a function is only known at run time (steal can
+    # add one), so the instruction also carries what the line means otherwise.
+    if allow_call and ends_call:
+        func_stmt_match = _FUNC_CALL.match(line)
+        if func_stmt_match:
+            fallback_op, fallback_payload = _parse_line(line, lineno, allow_call=False)
+            fallback = Instr(fallback_op, fallback_payload, lineno, line)
+            return OP_CALL, (sys.intern(func_stmt_match.group(1)), _parse_args(func_stmt_match.group(2)), fallback)
+
+    # --- Object Instantiation ---
+    if first == 'v' and line.startswith("var ") and "new " in line:
+        try:
+            name_part, value_part = line[4:].split('=', 1)
+        except ValueError:
+            return OP_ERROR, f"Syntax Error on line {lineno}: Invalid variable assignment."
+        match = _NEW.match(value_part.strip())
+        if not match:
+            return OP_ERROR, "Syntax Error: Invalid 'new' statement."
+        return OP_NEW, (sys.intern(name_part.strip()), sys.intern(match.group(1)), _parse_args(match.group(2)))
+
+    # --- Method Call (statement) ---
+    if ends_call:
+        method_stmt_match = _METHOD_CALL.match(line)
+        if method_stmt_match:
+            obj_expr, method_name, arg_str = method_stmt_match.groups()
+            return OP_METHOD, (_prewarm(obj_expr), '$' in obj_expr, sys.intern(method_name), _parse_args(arg_str))
+
+    if first == 'v':
+        if line.startswith("var "):
+            return _parse_var(line, lineno)
+    elif first == 's':
+        if line.startswith("say "):
+            return _parse_say(line)
+    elif first == 'i':
+        if line.startswith("input "):
+            return OP_INPUT, sys.intern(line.split()[1].strip())
+        if line.startswith("if "):
+            return OP_IF, (_prewarm(line[3:]), '$' in line, None, None)
+    elif first == 'e':
+        if line.startswith("emptyline "):
+            return OP_EMPTYLINE, (line[10:], '$' in line)
+        if line == "else" or line in _BLOCK_CLOSERS:
+            return OP_NOP, None
+    elif first == 'l':
+        if line.startswith("loop "):
+            return OP_LOOP, (line[5:], '$' in line, None, True)
+    elif first == 'm':
+        if line.startswith("math "):
+            return OP_MATH, (_prewarm(line[5:]), '$' in line)
+    elif first == 'r':
+        if line.startswith("return "):
+            return OP_RETURN, (_prewarm(line[7:].strip()), '$' in line, None)
+    elif line == "pause":
+        return OP_PAUSE, None
+    elif line == "break":
+        return OP_BREAK, None
+    elif line == "help":
+        return OP_HELP, None
+    return OP_ERROR, f"Unknown command or syntax error on line {lineno}: '{line}'"
+
+def _parse_var(line: str, lineno: int) -> Tuple[int, Any]:
+    """Parses a 'var' line that is not an instantiation."""
+    # Instance attribute set; a missing '=' is reported at run time,
+    # after the check that 'this' is available.
+    if line.startswith("var this."):
+        _, assign_part = line.split("var this.", 1)
+        if '=' not in assign_part:
+            return OP_SET_ATTR, None
+        attr_name, value_str = assign_part.split('=', 1)
+        value_str = value_str.strip()
+        return OP_SET_ATTR, (sys.intern(attr_name.strip()), _prewarm(value_str), '$' in value_str)
+
+    # Regular variable assignment (including assign-from-function-call)
+    try:
+        name_part, value_part = line[4:].split('=', 1)
+    except ValueError:
+        return OP_ERROR, f"Syntax Error on line {lineno}: Invalid variable assignment."
+    value_str = value_part.strip()
+    # var x = foo(a, b)
+    var_call_match = _FUNC_CALL.match(value_str)
+    call = None
+    if var_call_match:
+        call = (sys.intern(var_call_match.group(1)), _parse_args(var_call_match.group(2)))
+    interp = '$' in value_str
+    if not interp and value_str.startswith('(') and value_str.endswith(')'):
+        value_str = '{' + value_str[1:-1] + '}'
+    return OP_VAR, (sys.intern(name_part.strip()), _prewarm(value_str), interp, call)
+
+def _parse_say(line: str) -> Tuple[int, Any]:
+    """Parses a 'say' line, resolving plain literals to their text up front."""
+    content = line[4:].strip()
+    if '$' not in content:
+        # Literals are printed as-is without going through eval
+        try:
+            value = ast.literal_eval(content)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            pass
         else:
-            self.attributes[name] = value
+            return OP_PRINT, content if value is None else str(value)
+    return OP_SAY, (_prewarm(content), '$' in content)
 
-def execute(lines, variables):
+def _compile_ir(lines) -> list:
     """
-    Executes a list of MSlash script lines.
-    Returns a value if a 'return' statement is hit.
+    Preparses script lines into a list of Instr records.
+    Blank and comment-only lines are dropped, and every if/loop is linked
+    to its matching else/end in the same pass.
     """
-    pc = 0
-    while pc < len(lines):
-        raw_line = lines[pc]
-        line_no_comments = strip_inline_comments(raw_line)
-        original_line = line_no_comments.strip()
-
-        if not original_line:
-            pc += 1
+    program = []
+    open_blocks = []  # [opener index, index of its 'else' or None, indices of its returns]
+    for index, raw_line in enumerate(lines):
+        line = strip_inline_comments(raw_line).strip()
+        if not line:
             continue
 
-        _dbg(f"L{pc+1} RAW: {raw_line.rstrip()}")
-        _dbg(f"L{pc+1} PARSED: {original_line}")
-
-        # --- Patterns ---
-        func_stmt_match = re.match(r'^([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$', original_line)
-        method_stmt_match = re.match(r'^(.*)\.([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$', original_line)
-
-        # --- Module Import: steal <symbol> from <file>.mslash ---
-        if original_line.startswith("steal "):
-            steal_match = re.match(r'^steal\s+([a-zA-Z_][a-zA-Z0-9_]*)\s+from\s+([^\s]+)$', original_line)
-            if not steal_match:
-                print(f"Syntax Error on line {pc+1}: Invalid steal syntax.")
-            else:
-                symbol = steal_match.group(1)
-                module_path = steal_match.group(2)
-                try:
-                    mod_vars, mod_funcs, mod_classes = load_module(module_path)
-                    if symbol in mod_vars:
-                        variables[symbol] = mod_vars[symbol]
-                        _dbg(f"STEAL var {symbol} from {module_path}")
-                    elif symbol in mod_funcs:
-                        FUNCTIONS[symbol] = mod_funcs[symbol]
-                        _dbg(f"STEAL func {symbol} from {module_path}")
-                    elif symbol in mod_classes:
-                        CLASSES[symbol] = mod_classes[symbol]
-                        _dbg(f"STEAL class {symbol} from {module_path}")
-                    else:
-                        print(f"Import Error on line {pc+1}: '{symbol}' not found in {module_path}.")
-                except FileNotFoundError:
-                    print(f"Import Error on line {pc+1}: Module file '{module_path}' not found.")
-                except Exception as e:
-                    print(f"Import Error on line {pc+1}: {e}")
-
-        # --- Global Function Call (statement) ---
-        elif func_stmt_match and func_stmt_match.group(1) in FUNCTIONS:
-            func_name = func_stmt_match.group(1)
-            arg_str = func_stmt_match.group(2)
-            func_info = FUNCTIONS[func_name]
-            arg_names = func_info['args']
-
-            arg_values_raw = [v.strip() for v in arg_str.split(',')] if arg_str else []
-            if len(arg_values_raw) != len(arg_names):
-                print(f"Error: Function '{func_name}' expects {len(arg_names)} arguments, but got {len(arg_values_raw)}.")
-            else:
-                arg_values = [safe_eval(substitute_vars(v, variables), variables) for v in arg_values_raw]
-                local_vars = dict(zip(arg_names, arg_values))
-                _dbg(f"CALL func {func_name}({', '.join(map(str, arg_values))})")
-                _ = execute(func_info['body'], local_vars)  # side-effects only
-
-        # --- Object Instantiation ---
-        elif original_line.startswith("var ") and "new " in original_line:
-            try:
-                name_part, value_part = original_line[4:].split('=', 1)
-                name = name_part.strip()
-
-                match = re.match(r'new\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)', value_part.strip())
-                if match:
-                    class_name = match.group(1)
-                    arg_str = match.group(2)
-
-                    if class_name in CLASSES:
-                        new_object = MSlashObject(class_name)
-
-                        if 'init' in CLASSES[class_name]['methods']:
-                            init_func = CLASSES[class_name]['methods']['init']
-                            arg_names = init_func['args']
-                            arg_values_raw = [v.strip() for v in arg_str.split(',')] if arg_str else []
-                            arg_values = [safe_eval(substitute_vars(v, variables), variables) for v in arg_values_raw]
+        pc = len(program)
+        op, payload = _parse_line(line, index + 1)
+        program.append(Instr(op, payload, index + 1, line))
+
+        # Any closer ends the innermost open block, whatever its kind
+        if line.startswith(_BLOCK_OPENERS):
+            open_blocks.append([pc, None, []])
+        elif line == "else":
+            if open_blocks:
+                open_blocks[-1][1] = pc
+        elif line in _BLOCK_CLOSERS:
+            if open_blocks:
+                start, else_pos, returns = open_blocks.pop()
+                _link_block(program, start, else_pos, pc)
+                if program[start].op in (OP_IF, OP_LOOP):
+                    # A 'return' inside an if/loop only leaves that block;
+                    # outer ends are kept for loops that never start
+                    for ret in returns:
+                        payload = program[ret].payload
+                        program[ret] = program[ret]._replace(payload=payload[:2] + ((payload[2] or ()) + (pc,),))
+                if open_blocks:
+                    open_blocks[-1][2].extend(returns)
+        elif op == OP_RETURN:
+            if open_blocks:
+                open_blocks[-1][2].append(pc)
+
+    # Keep instructions separate in debug mode so every line is traced
+    if not DEBUG:
+        _fuse_runs(program)
+    return program
+
+def _link_block(program, start: int, else_pos, end: int):
+    """Back-patches the jump targets of an if/loop block once its end is known."""
+    opener = program[start]
+    if opener.op == OP_IF:
+        program[start] = opener._replace(payload=opener.payload[:2] + (else_pos, end))
+        if else_pos is not None:
+            program[else_pos] = program[else_pos]._replace(op=OP_ELSE, payload=end)
+    elif opener.op == OP_LOOP:
+        # A body that never assigns can share the enclosing scope
+        scoped = any(program[i].op in _SCOPE_WRITERS for i in range(start + 1, end))
+        program[start] = opener._replace(payload=opener.payload[:2] + (end, scoped))
+        program[end] = program[end]._replace(op=OP_ENDLOOP, payload=start)
+
+def _fuse_runs(program: list):
+    """
+    Replaces the first instruction of each run of consecutive statements with
+    an OP_RUN carrying the run's (handler, instr) pairs, so execute() can
+    dispatch the whole run in one step. Runs never span a jump target; the
+    instructions they cover stay in place for the indices to remain valid.
+    """
+    targets = set()
+    for pc, instr in enumerate(program):
+        if instr.op == OP_IF:
+            _, _, else_pos, endif_pos = instr.payload
+            if else_pos is not None:
+                targets.add(else_pos + 1)
+            if endif_pos is not None:
+                targets.add(endif_pos + 1)
+        elif instr.op == OP_LOOP:
+            targets.add(pc + 1)
+            if instr.payload[2] is not None:
+                targets.add(instr.payload[2] + 1)
 
-                            local_vars = {'this': new_object}
-                            local_vars.update(dict(zip(arg_names, arg_values)))
+    pc = 0
+    while pc < len(program):
+        end = pc
+        while end < len(program) and program[end].op < OP_RETURN and (end == pc or end not in targets):
+            end += 1
+        if end - pc > 1:
+            steps = tuple((_HANDLERS[instr.op], instr) for instr in program[pc:end])
+            program[pc] = program[pc]._replace(op=OP_RUN, payload=(steps, end))
+        pc = max(end, pc + 1)
+
+# --- Instruction Handlers ---
+
+def _bind_args(arg_names: tuple, arg_exprs, variables: dict, local_vars: dict) -> dict:
+    """
+    Evaluates preparsed call arguments straight into the callee's scope,
+    one insert per parameter; any that fail become None.
+    """
+    for name, (expr, interp) in zip(arg_names, arg_exprs):
+        local_vars[name] = _eval_or_none(substitute_vars(expr, variables) if interp else expr, variables)
+    return local_vars
 
-                            _dbg(f"NEW {class_name}({', '.join(map(str, arg_values))}) as {name} -> calling init")
-                            execute(init_func['body'], local_vars)
+def _args_text(arg_names: tuple, local_vars: dict) -> str:
+    """Formats bound argument values for debug output."""
+    return ', '.join(str(local_vars[name]) for name in arg_names if name in local_vars)
 
-                        variables[name] = new_object
-                        _dbg(f"SET var {name} = <instance of {class_name}>")
-                    else:
-                        print(f"Error: Class '{class_name}' is not defined.")
-                else:
-                    print(f"Syntax Error: Invalid 'new' statement.")
-            except ValueError:
-                print(f"Syntax Error on line {pc + 1}: Invalid variable assignment.")
+def _op_steal(instr, variables, blueprints):
+    symbol, module_path = instr.payload
+    try:
+        mod_vars, mod_funcs, mod_classes = load_module(module_path)
+        if symbol in mod_vars:
+            variables[symbol] = mod_vars[symbol]
+            _dbg(f"STEAL var {symbol} from {module_path}")
+        elif symbol in mod_funcs:
+            blueprints.functions[symbol] = mod_funcs[symbol]
+            _dbg(f"STEAL func {symbol} from {module_path}")
+        elif symbol in mod_classes:
+            blueprints.classes[symbol] = mod_classes[symbol]
+            _dbg(f"STEAL class {symbol} from {module_path}")
+        else:
+            print(f"Import Error on line {instr.lineno}: '{symbol}' not found in {module_path}.")
+    except FileNotFoundError:
+        print(f"Import Error on line {instr.lineno}: Module file '{module_path}' not found.")
+    except Exception as e:
+        print(f"Import Error on line {instr.lineno}: {e}")
+
+def _op_call(instr, variables, blueprints):
+    func_name, arg_exprs, fallback = instr.payload
+    func_info = blueprints.functions.get(func_name)
+    if func_info is None:
+        _HANDLERS[fallback.op](fallback, variables, blueprints)
+        return
+
+    arg_names = func_info['args']
+    if len(arg_exprs) != len(arg_names):
+        print(f"Error: Function '{func_name}' expects {len(arg_names)} arguments, but got {len(arg_exprs)}.")
+    else:
+        local_vars = _bind_args(arg_names, arg_exprs, variables, {})
+        if DEBUG:
+            _dbg(f"CALL func {func_name}({_args_text(arg_names, local_vars)})")
+        _ = execute(func_info['ir'], local_vars, blueprints)  # side-effects only
+
+def _op_new(instr, variables, blueprints):
+    name, class_name, arg_exprs = instr.payload
+    classes = blueprints.classes
+    if class_name not in classes:
+        print(f"Error: Class '{class_name}' is not defined.")
+        return
+
+    new_object = MSlashObject(class_name)
+    if 'init' in classes[class_name]['methods']:
+        init_func = classes[class_name]['methods']['init']
+        arg_names = init_func['args']
+        local_vars = _bind_args(arg_names, arg_exprs, variables, {'this': new_object})
+
+        if DEBUG:
+            _dbg(f"NEW {class_name}({_args_text(arg_names, local_vars)}) as {name} -> calling init")
+        execute(init_func['ir'], local_vars, blueprints)
+
+    variables[name] = new_object
+    _dbg(f"SET var {name} = <instance of {class_name}>")
+
+def _op_method(instr, variables, blueprints):
+    obj_expr, interp, method_name, arg_exprs = instr.payload
+    obj_instance = safe_eval(substitute_vars(obj_expr, variables) if interp else obj_expr, variables)
+
+    if not isinstance(obj_instance, MSlashObject):
+        print(f"Error: '{obj_expr}' did not evaluate to an object.")
+        return
+
+    class_info = blueprints.classes.get(obj_instance.class_name)
+    if class_info and method_name in class_info['methods']:
+        method_info = class_info['methods'][method_name]
+        arg_names = method_info['args']
+        local_vars = _bind_args(arg_names, arg_exprs, variables, {'this': obj_instance})
+
+        if DEBUG:
+            _dbg(f"CALL {obj_expr}.{method_name}({_args_text(arg_names, local_vars)})")
+        ret = execute(method_info['ir'], local_vars, blueprints)
+        _dbg(f"RET {obj_expr}.{method_name} -> {ret}")
+    else:
+        print(f"Error: Method '{method_name}' not found on object.")
 
-        # --- Method Call (statement) ---
-        elif method_stmt_match:
-            obj_expr = method_stmt_match.group(1)
-            method_name = method_stmt_match.group(2)
-            arg_str = method_stmt_match.group(3)
+def _op_set_attr(instr, variables, blueprints):
+    if 'this' not in variables or not isinstance(variables['this'], MSlashObject):
+        print(f"Error: 'this' can only be used inside a class method.")
+    elif instr.payload is None:
+        print(f"Syntax Error on line {instr.lineno}: Invalid attribute assignment.")
+    else:
+        attr_name, value_str, interp = instr.payload
+        value = _eval_or_none(substitute_vars(value_str, variables) if interp else value_str, variables)
+        variables['this'].attributes[attr_name] = value
+        _dbg(f"SET this.{attr_name} = {value}")
+
+def _op_var(instr, variables, blueprints):
+    name, value_str, interp, call = instr.payload
+
+    if call is not None and call[0] in blueprints.functions:
+        func_name, arg_exprs = call
+        func_info = blueprints.functions[func_name]
+        arg_names = func_info['args']
+
+        if len(arg_exprs) != len(arg_names):
+            print(f"Error: Function '{func_name}' expects {len(arg_names)} arguments, but got {len(arg_exprs)}.")
+            variables[name] = None
+        else:
+            local_vars = _bind_args(arg_names, arg_exprs, variables, {})
+            if DEBUG:
+                _dbg(f"CALL func {func_name}({_args_text(arg_names, local_vars)}) for assignment to {name}")
+            return_value = execute(func_info['ir'], local_vars, blueprints)
+            variables[name] = return_value
+            _dbg(f"SET var {name} = {return_value}")
+        return
+
+    # Regular assignment with interpolation; Vata dict literal via ()
+    # (already rewritten at parse time when there is nothing to fill in)
+    if interp:
+        value_str = substitute_vars(value_str, variables)
+        if value_str.startswith('(') and value_str.endswith(')'):
+            value_str = '{' + value_str[1:-1] + '}'
+
+    result = safe_eval(value_str, variables)
+    if result is not _EVAL_ERROR:
+        variables[name] = result
+        _dbg(f"SET var {name} = {result}")
+    else:
+        print(f"Syntax Error or invalid value for variable '{name}' on line {instr.lineno}.")
+
+def _op_say(instr, variables, blueprints):
+    content, interp = instr.payload
+    substituted_content = substitute_vars(content, variables) if interp else content
+    final_output = safe_eval(substituted_content, variables)
+    if final_output is not _EVAL_ERROR:
+        print(final_output)
+    else:
+        print(substituted_content)
 
-            obj_instance = safe_eval(substitute_vars(obj_expr, variables), variables)
+def _op_print(instr, variables, blueprints):
+    print(instr.payload)
 
-            if isinstance(obj_instance, MSlashObject):
-                class_info = CLASSES.get(obj_instance.class_name)
-                if class_info and method_name in class_info['methods']:
-                    method_info = class_info['methods'][method_name]
-                    arg_names = method_info['args']
+def _op_input(instr, variables, blueprints):
+    var_name = instr.payload
+    user_input = input()
+    try:
+        parsed_input = eval(user_input, {"__builtins__": None})
+        if isinstance(parsed_input, (int, float)):
+            variables[var_name] = parsed_input
+        else:
+            variables[var_name] = user_input
+    except Exception:
+        variables[var_name] = user_input
+    _dbg(f"INPUT -> {var_name} = {variables[var_name]}")
 
-                    arg_values_raw = [v.strip() for v in arg_str.split(',')] if arg_str else []
-                    arg_values = [safe_eval(substitute_vars(v, variables), variables) for v in arg_values_raw]
+def _op_math(instr, variables, blueprints):
+    expression, interp = instr.payload
+    result = safe_eval(substitute_vars(expression, variables) if interp else expression, variables)
+    if result is not _EVAL_ERROR:
+        print(result)
 
-                    local_vars = {'this': obj_instance}
-                    local_vars.update(dict(zip(arg_names, arg_values)))
+def _op_emptyline(instr, variables, blueprints):
+    try:
+        count_str, interp = instr.payload
+        num_lines = int((substitute_vars(count_str, variables) if interp else count_str).strip())
+        if num_lines > 0:
+            print("\n" * (num_lines - 1), end="")
+    except (ValueError, IndexError):
+        print(f"Invalid number for emptyline on line {instr.lineno}")
+
+def _op_pause(instr, variables, blueprints):
+    input("Press Enter to continue...")
+
+def _op_break(instr, variables, blueprints):
+    print("--- Script terminated by break ---")
+    sys.exit()
+
+def _op_help(instr, variables, blueprints):
+    print("--- MSlash Help ---")
+    print("steal <symbol> from <file>.mslash - Import a variable/function/class from another file.")
+    print("my_func(args)            - Calls a global function.")
+    print("class <name> / endclass  - Defines a class.")
+    print("func <name>(args) / endfunc - Defines a function or method.")
+    print("return <value>           - Returns a value from a function/method.")
+    print("{ comment }              - An inline comment.")
+    print("var <name> = <value>     - Assigns a value. Supports var x = myFunc(...).")
+    print("say <message>            - Prints a message to the console.")
+    print("input <var_name>         - Prompts for user input.")
+    print("math <expression>        - Evaluates a mathematical expression.")
+    print("if <condition>           - Starts a conditional block.")
+    print("else / endif             - Used for conditional logic.")
+    print("loop <number> / endloop  - Starts a loop block.")
+    print("emptyline <number>       - Prints a number of empty lines.")
+    print("pause                    - Pauses execution until Enter is pressed.")
+    print("break                    - Terminates the script immediately.")
+    print("\n--- Data Types ---")
+    print("List: [item1, item2, ...]")
+    print("Vata (Dictionary): (\"key1\":\"value1\", ...)")
+    print("---------------------")
+
+def _op_nop(instr, variables, blueprints):
+    pass
+
+def _op_error(instr, variables, blueprints):
+    print(instr.payload)
+
+# Handlers for the statement opcodes, indexed by opcode
+_HANDLER_TABLE = {
+    OP_STEAL: _op_steal,
+    OP_CALL: _op_call,
+    OP_NEW: _op_new,
+    OP_METHOD: _op_method,
+    OP_SET_ATTR: _op_set_attr,
+    OP_VAR: _op_var,
+    OP_SAY: _op_say,
+    OP_PRINT: _op_print,
+    OP_INPUT: _op_input,
+    OP_MATH: _op_math,
+    OP_EMPTYLINE: _op_emptyline,
+    OP_PAUSE: _op_pause,
+    OP_BREAK: _op_break,
+    OP_HELP: _op_help,
+    OP_NOP: _op_nop,
+    OP_ERROR: _op_error,
+}
+_HANDLERS = [_HANDLER_TABLE[op] for op in range(OP_RETURN)]
+
+def execute(program, variables, blueprints: Blueprints = None):
+    """
+    Executes a list of preparsed MSlash instructions.
+    Functions and classes are looked up in `blueprints` (the main script's by default).
+    Returns a value if a 'return' statement is hit.
+    """
+    if blueprints is None:
+        blueprints = _MAIN_BLUEPRINTS
+    # Hot names are bound to locals; the program never changes while it runs
+    handlers = _HANDLERS
+    debug = DEBUG
+    n = len(program)
+    loops = []  # [loop index, iterations left, enclosing variables, scoped] per running loop
+    pc = 0
+    while pc < n:
+        instr = program[pc]
+        if debug:
+            _dbg(f"L{instr.lineno}: {instr.source}")
+
+        # Plain statements are the common case, so try them first
+        op = instr.op
+        if op < OP_RETURN:
+            handlers[op](instr, variables, blueprints)
+            pc += 1
+            continue
 
-                    _dbg(f"CALL {obj_expr}.{method_name}({', '.join(map(str, arg_values))})")
-                    ret = execute(method_info['body'], local_vars)
-                    _dbg(f"RET {obj_expr}.{method_name} -> {ret}")
-                else:
-                    print(f"Error: Method '{method_name}' not found on object.")
-            else:
-                print(f"Error: '{obj_expr}' did not evaluate to an object.")
-
-        elif original_line.startswith("var "):
-            # Instance attribute set
-            if original_line.startswith("var this."):
-                if 'this' in variables and isinstance(variables['this'], MSlashObject):
-                    try:
-                        _, assign_part = original_line.split("var this.", 1)
-                        attr_name, value_str = assign_part.split('=', 1)
-                        attr_name = attr_name.strip()
-                        value = safe_eval(substitute_vars(value_str.strip(), variables), variables)
-                        variables['this'].attributes[attr_name] = value
-                        _dbg(f"SET this.{attr_name} = {value}")
-                    except ValueError:
-                        print(f"Syntax Error on line {pc+1}: Invalid attribute assignment.")
-                else:
-                    print(f"Error: 'this' can only be used inside a class method.")
+        if op == OP_RUN:
+            # Fused straight-line statements, then carry on after them
+            steps, pc = instr.payload
+            for handler, step in steps:
+                handler(step, variables, blueprints)
+            continue
 
+        elif op == OP_RETURN:
+            expression, interp, block_ends = instr.payload
+            return_value = _eval_or_none(substitute_vars(expression, variables) if interp else expression, variables)
+            _dbg(f"RETURN {return_value}")
+            # Inside an if/loop the value is dropped and only that block is
+            # left; a loop carries on with its next iteration. A loop with an
+            # invalid count ran its body in place, so it is skipped over.
+            if block_ends is None:
+                return return_value
+            for block_end in block_ends:
+                if program[block_end].op != OP_ENDLOOP or (loops and loops[-1][0] == program[block_end].payload):
+                    pc = block_end
+                    break
             else:
-                # Regular variable assignment (including assign-from-function-call)
-                try:
-                    name_part, value_part = original_line[4:].split('=', 1)
-                    name = name_part.strip()
-                    value_str = value_part.strip()
-
-                    # var x = foo(a, b)
-                    var_call_match = re.match(r'^([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$', value_str)
-                    if var_call_match and var_call_match.group(1) in FUNCTIONS:
-                        func_name = var_call_match.group(1)
-                        arg_str = var_call_match.group(2)
-                        func_info = FUNCTIONS[func_name]
-                        arg_names = func_info['args']
-                        arg_values_raw = [v.strip() for v in arg_str.split(',')] if arg_str else []
-
-                        if len(arg_values_raw) != len(arg_names):
-                            print(f"Error: Function '{func_name}' expects {len(arg_names)} arguments, but got {len(arg_values_raw)}.")
-                            variables[name] = None
-                        else:
-                            arg_values = [safe_eval(substitute_vars(v, variables), variables) for v in arg_values_raw]
-                            local_vars = dict(zip(arg_names, arg_values))
-                            _dbg(f"CALL func {func_name}({', '.join(map(str, arg_values))}) for assignment to {name}")
-                            return_value = execute(func_info['body'], local_vars)
-                            variables[name] = return_value
-                            _dbg(f"SET var {name} = {return_value}")
-
-                    else:
-                        # Regular assignment with interpolation; Vata dict literal via ()
-                        value_str = substitute_vars(value_str, variables)
-                        if value_str.startswith('(') and value_str.endswith(')'):
-                            value_str = '{' + value_str[1:-1] + '}'
-
-                        result = safe_eval(value_str, variables)
-                        if result is not None:
-                            variables[name] = result
-                            _dbg(f"SET var {name} = {result}")
-                        else:
-                            print(f"Syntax Error or invalid value for variable '{name}' on line {pc+1}.")
-                except ValueError:
-                    print(f"Syntax Error on line {pc + 1}: Invalid variable assignment.")
-
-        elif original_line.startswith("say "):
-            content_to_eval = original_line[4:].strip()
-            substituted_content = substitute_vars(content_to_eval, variables)
-            final_output = safe_eval(substituted_content, variables)
-            if final_output is not None:
-                print(final_output)
-            else:
-                print(substituted_content)
-
-        elif original_line.startswith("input "):
-            var_name = original_line.split()[1].strip()
-            user_input = input()
-            try:
-                parsed_input = eval(user_input, {"__builtins__": None})
-                if isinstance(parsed_input, (int, float)):
-                    variables[var_name] = parsed_input
-                else:
-                    variables[var_name] = user_input
-            except Exception:
-                variables[var_name] = user_input
-            _dbg(f"INPUT -> {var_name} = {variables[var_name]}")
-
-        elif original_line.startswith("math "):
-            line = substitute_vars(original_line, variables)
-            result = safe_eval(line[5:], variables)
-            if result is not None:
-                print(result)
-
-        elif original_line.startswith("emptyline "):
-            line = substitute_vars(original_line, variables)
-            try:
-                num_lines = int(line[10:].strip())
-                if num_lines > 0:
-                    print("\n" * (num_lines - 1), end="")
-            except (ValueError, IndexError):
-                print(f"Invalid number for emptyline on line {pc + 1}")
-
-        elif original_line == "pause":
-            input("Press Enter to continue...")
+                return return_value
+            continue
 
-        elif original_line == "break":
-            print("--- Script terminated by break ---")
-            sys.exit()
+        elif op == OP_IF:
+            condition_str, interp, else_pos, endif_pos = instr.payload
+            if interp:
+                condition_str = substitute_vars(condition_str, variables)
+            result = _eval_or_none(condition_str, variables)
 
-        elif original_line.startswith("return "):
-            expression = original_line[7:].strip()
-            return_value = safe_eval(substitute_vars(expression, variables), variables)
-            _dbg(f"RETURN {return_value}")
-            return return_value
-
-        elif original_line.startswith("if "):
-            line = substitute_vars(original_line, variables)
-            condition_str = line[3:]
-            result = safe_eval(condition_str, variables)
-
-            if_block_start = pc + 1
-            else_pos = -1
-            endif_pos = -1
-            nest_level = 0
-
-            for i in range(if_block_start, len(lines)):
-                scan_line = strip_inline_comments(lines[i]).strip()
-                if scan_line.startswith(("if ", "loop ", "func ", "class ")):
-                    nest_level += 1
-                elif scan_line in ["endif", "endloop", "endfunc", "endclass"]:
-                    if nest_level == 0:
-                        endif_pos = i
-                        break
-                    else:
-                        nest_level -= 1
-                elif scan_line == "else" and nest_level == 0:
-                    else_pos = i
-
-            if endif_pos == -1:
-                print(f"Syntax Error: 'if' on line {pc + 1} has no matching 'endif'.")
+            if endif_pos is None:
+                print(f"Syntax Error: 'if' on line {instr.lineno} has no matching 'endif'.")
                 break
 
             _dbg(f"IF {condition_str} -> {result}")
-            if result:
-                if_block_end = else_pos if else_pos != -1 else endif_pos
-                execute(lines[if_block_start:if_block_end], variables)
-            else:
-                if else_pos != -1:
-                    execute(lines[else_pos + 1:endif_pos], variables)
+            if not result:
+                pc = else_pos if else_pos is not None else endif_pos
 
-            pc = endif_pos
+        elif op == OP_ELSE:
+            # End of a taken 'if' branch
+            pc = instr.payload
 
-        elif original_line.startswith("loop "):
-            line = substitute_vars(original_line, variables)
+        elif op == OP_LOOP:
+            times_str, interp, loop_body_end, scoped = instr.payload
             try:
-                times = int(line.split()[1])
+                times = int((substitute_vars(times_str, variables) if interp else times_str).split()[0])
             except (ValueError, IndexError):
-                print(f"Syntax Error on line {pc + 1}: Invalid loop syntax.")
+                # The body then runs once, in place
+                print(f"Syntax Error on line {instr.lineno}: Invalid loop syntax.")
                 pc += 1
                 continue
 
-            loop_body_start = pc + 1
-            loop_body_end = -1
-            nest_level = 0
-            for i in range(loop_body_start, len(lines)):
-                scan_line = strip_inline_comments(lines[i]).strip()
-                if scan_line.startswith(("if ", "loop ", "func ", "class ")):
-                    nest_level += 1
-                elif scan_line in ["endif", "endloop", "endfunc", "endclass"]:
-                    if nest_level == 0:
-                        loop_body_end = i
-                        break
-                    else:
-                        nest_level -= 1
-
-            if loop_body_end == -1:
-                print(f"Syntax Error: 'loop' on line {pc + 1}: No matching 'endloop'.")
+            if loop_body_end is None:
+                print(f"Syntax Error: 'loop' on line {instr.lineno}: No matching 'endloop'.")
                 break
 
-            loop_code = lines[loop_body_start:loop_body_end]
-            _dbg(f"LOOP {times}x (body lines {loop_body_start+1}-{loop_body_end})")
-            for _ in range(times):
-                execute(loop_code, variables.copy())
-            pc = loop_body_end
-
-        elif original_line == "help":
-            print("--- MSlash Help ---")
-            print("steal <symbol> from <file>.mslash - Import a variable/function/class from another file.")
-            print("my_func(args)            - Calls a global function.")
-            print("class <name> / endclass  - Defines a class.")
-            print("func <name>(args) / endfunc - Defines a function or method.")
-            print("return <value>           - Returns a value from a function/method.")
-            print("{ comment }              - An inline comment.")
-            print("var <name> = <value>     - Assigns a value. Supports var x = myFunc(...).")
-            print("say <message>            - Prints a message to the console.")
-            print("input <var_name>         - Prompts for user input.")
-            print("math <expression>        - Evaluates a mathematical expression.")
-            print("if <condition>           - Starts a conditional block.")
-            print("else / endif             - Used for conditional logic.")
-            print("loop <number> / endloop  - Starts a loop block.")
-            print("emptyline <number>       - Prints a number of empty lines.")
-            print("pause                    - Pauses execution until Enter is pressed.")
-            print("break                    - Terminates the script immediately.")
-            print("\n--- Data Types ---")
-            print("List: [item1, item2, ...]")
-            print("Vata (Dictionary): (\"key1\":\"value1\", ...)")
-            print("---------------------")
-
-        elif original_line not in ["else", "endif", "endloop", "endfunc", "endclass"]:
-            print(f"Unknown command or syntax error on line {pc + 1}: '{original_line}'")
+            _dbg(f"LOOP {times}x (body lines {instr.lineno + 1}-{program[loop_body_end].lineno - 1})")
+            if times > 0:
+                # Each iteration of a scoped loop gets its own copy of the enclosing variables
+                loops.append([pc, times - 1, variables, scoped])
+                if scoped:
+                    variables = variables.copy()
+            else:
+                pc = loop_body_end
+
+        elif op == OP_ENDLOOP:
+            if loops and loops[-1][0] == instr.payload:
+                loop = loops[-1]
+                if loop[1] > 0:
+                    loop[1] -= 1
+                    if loop[3]:
+                        variables = loop[2].copy()
+                    pc = instr.payload
+                else:
+                    loops.pop()
+                    variables = loop[2]
 
         pc += 1
     return None
 
-def preprocess_script(all_lines):
+def preprocess_script(all_lines, blueprints: Blueprints = None):
     """
-    First pass over the script to find all class and function definitions.
+    First pass over the script to find all class and function definitions,
+    which are recorded in `blueprints` (the main script's by default) with
+    their bodies already preparsed.
+    Returns the remaining main code as preparsed instructions.
     """
+    if blueprints is None:
+        blueprints = _MAIN_BLUEPRINTS
     main_code = []
     in_construct = None
     construct_name = None
@@ -443,7 +826,7 @@ def preprocess_script(all_lines):
         if clean_line.startswith("class "):
             if not in_construct:
                 in_construct = 'class'
-                current_class_name = clean_line.split()[1]
+                current_class_name = sys.intern(clean_line.split()[1])
                 construct_body = []
                 nest_level = 0
             else:
@@ -453,12 +836,12 @@ def preprocess_script(all_lines):
         elif clean_line.startswith("func "):
             if not in_construct:
                 in_construct = 'func'
-                match = re.match(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)', clean_line)
+                match = _FUNC_DEF.match(clean_line)
                 if match:
-                    construct_name = match.group(1)
+                    construct_name = sys.intern(match.group(1))
                     arg_str = match.group(2)
-                    func_args = [arg.strip() for arg in arg_str.split(',')] if arg_str else []
-                    FUNCTIONS[construct_name] = {'args': func_args, 'body': []}
+                    func_args = tuple(sys.intern(arg.strip()) for arg in arg_str.split(',')) if arg_str else ()
+                    blueprints.functions[construct_name] = {'args': func_args, 'ir': []}
                 construct_body = []
                 nest_level = 0
             else:
@@ -467,7 +850,7 @@ def preprocess_script(all_lines):
 
         elif clean_line.startswith("endclass"):
             if in_construct == 'class' and nest_level == 0:
-                preprocess_class_body(current_class_name, construct_body)
+                preprocess_class_body(current_class_name, construct_body, blueprints)
                 in_construct = None
                 construct_body = []
                 current_class_name = None
@@ -480,7 +863,7 @@ def preprocess_script(all_lines):
         elif clean_line == "endfunc":
             if in_construct and nest_level == 0:
                 if in_construct == 'func':
-                    FUNCTIONS[construct_name]['body'] = construct_body
+                    blueprints.functions[construct_name]['ir'] = _compile_ir(construct_body)
                 in_construct = None
                 construct_body = []
             elif in_construct:
@@ -501,14 +884,14 @@ def preprocess_script(all_lines):
 
         i += 1
 
-    return main_code
+    return _compile_ir(main_code)
 
-def preprocess_class_body(class_name, class_lines):
-    """Parses the body of a class to find its methods."""
+def preprocess_class_body(class_name, class_lines, blueprints: Blueprints = None):
+    """Parses the body of a class to find its methods and preparses each one."""
     methods = {}
     in_method = False
     method_name = None
-    method_args = []
+    method_args = ()
     method_body = []
     nest_level = 0
 
@@ -517,11 +900,11 @@ def preprocess_class_body(class_name, class_lines):
         if clean_line.startswith("func "):
             if not in_method:
                 in_method = True
-                match = re.match(r'func\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)', clean_line)
+                match = _FUNC_DEF.match(clean_line)
                 if match:
-                    method_name = match.group(1)
+                    method_name = sys.intern(match.group(1))
                     arg_str = match.group(2)
-                    method_args = [arg.strip() for arg in arg_str.split(',')] if arg_str else []
+                    method_args = tuple(sys.intern(arg.strip()) for arg in arg_str.split(',')) if arg_str else ()
                 method_body = []
                 nest_level = 0
             else:
@@ -530,7 +913,7 @@ def preprocess_class_body(class_name, class_lines):
 
         elif clean_line == "endfunc":
             if in_method and nest_level == 0:
-                methods[method_name] = {'args': method_args, 'body': method_body}
+                methods[method_name] = {'args': method_args, 'ir': _compile_ir(method_body)}
                 in_method = False
                 method_body = []
             elif in_method:
@@ -545,34 +928,39 @@ def preprocess_class_body(class_name, class_lines):
                 if nest_level > 0:
                     nest_level -= 1
 
-    CLASSES[class_name] = {'methods': methods}
+    if blueprints is None:
+        blueprints = _MAIN_BLUEPRINTS
+    blueprints.classes[class_name] = {'methods': methods}
 
 def load_module(module_path: str) -> Tuple[dict, dict, dict]:
     """
     Load another MSlash file in an isolated environment and return:
       (module_variables, module_functions, module_classes)
+    Each file is loaded once; later steals from it reuse the same result.
     """
-    global FUNCTIONS, CLASSES
-    saved_functions = FUNCTIONS
-    saved_classes = CLASSES
+    module_key = os.path.realpath(module_path)
+    cached = _MODULE_CACHE.get(module_key)
+    if cached is not None:
+        return cached
+
+    with open(module_path, "r") as f:
+        lines = f.read().split("\n")
+    module_blueprints = Blueprints()
+    _dbg(f"--- PREPROCESS MODULE {module_path} ---")
+    main_script_lines = preprocess_script(lines, module_blueprints)
+    module_vars = {}
+    # Registered before running, so a circular steal sees the partly
+    # loaded module instead of loading it again
+    result = (module_vars, module_blueprints.functions, module_blueprints.classes)
+    _MODULE_CACHE[module_key] = result
+    _dbg(f"--- EXECUTE MODULE {module_path} ---")
     try:
-        # Isolate module environment
-        FUNCTIONS = {}
-        CLASSES = {}
-        with open(module_path, "r") as f:
-            lines = f.readlines()
-        _dbg(f"--- PREPROCESS MODULE {module_path} ---")
-        main_script_lines = preprocess_script(lines)
-        module_vars = {}
-        _dbg(f"--- EXECUTE MODULE {module_path} ---")
-        execute(main_script_lines, module_vars)
-        module_functions = FUNCTIONS
-        module_classes = CLASSES
-        return module_vars, module_functions, module_classes
-    finally:
-        # Restore caller's global registries
-        FUNCTIONS = saved_functions
-        CLASSES = saved_classes
+        execute(main_script_lines, module_vars, module_blueprints)
+    except BaseException:
+        # Only a completed load is kept; a later steal runs the module again
+        _MODULE_CACHE.pop(module_key, None)
+        raise
+    return result
 
 def _parse_cli():
     """
@@ -595,7 +983,7 @@ def main(target_file: str):
     """
     try:
         with open(target_file, "r") as file:
-            lines = file.readlines()
+            lines = file.read().split("\n")
 
         _dbg(f"--- PREPROCESS {target_file} ---")
         main_script_lines = preprocess_script(lines)